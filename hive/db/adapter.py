@@ -1,6 +1,9 @@
 """Wrapper for sqlalchemy, providing a simple interface."""
 
+import csv
+import io
 import logging
+import re
 from time import perf_counter as perf
 from collections import OrderedDict
 from funcy.seqs import first
@@ -12,6 +15,25 @@ logging.getLogger('sqlalchemy.engine').setLevel(logging.WARNING)
 
 log = logging.getLogger(__name__)
 
+def _positional_sql(clause, dialect):
+    """Render a `text()` clause with `$n` params, for use in `PREPARE`.
+
+    Returns the sql and the bind names in `$n` order. The clause is
+    compiled by sqlalchemy, so binds are found exactly as when querying;
+    the `%(name)s`/`%%` output of pyformat drivers is then converted.
+    """
+    assert dialect.paramstyle == 'pyformat', dialect.paramstyle
+    names = []
+    def _param(match):
+        if not match.group(1):
+            return '%' # unescape %%
+        if match.group(1) not in names:
+            names.append(match.group(1))
+        return '$%d' % (names.index(match.group(1)) + 1)
+
+    compiled = clause.compile(dialect=dialect).string
+    return re.sub(r'%%|%\((\w+)\)s', _param, compiled), names
+
 class Db:
     """RDBMS adapter for hive. Handles connecting and querying."""
 
@@ -41,6 +63,9 @@ class Db:
         self._engine = None
         self._trx_active = False
         self._prep_sql = {}
+        self._prepared = {}
+        self._prepared_src = {}
+        self._prepared_conn = None
 
         self._conn = self.engine().connect()
         # Since we need to manage transactions ourselves, yet the
@@ -118,6 +143,105 @@ class Db:
         if trx:
             self.query("COMMIT")
 
+    def copy_rows(self, table, columns, rows):
+        """Bulk-load `rows` (iterable of tuples) into `table`.
+
+        On postgres, rows are streamed through `COPY ... FROM STDIN`
+        on the current connection (so it joins any open transaction).
+        Other engines fall back to one parameterized INSERT per row.
+        """
+        if not rows:
+            return
+
+        if self.engine_name() != 'postgresql':
+            sql = "INSERT INTO %s (%s) VALUES (%s)" % (
+                table, ', '.join(columns), ', '.join(':' + c for c in columns))
+            for row in rows:
+                self.query(sql, **dict(zip(columns, row)))
+            return
+
+        buf = io.StringIO()
+        csv.writer(buf).writerows(rows)
+        buf.seek(0)
+
+        sql = "COPY %s (%s) FROM STDIN WITH (FORMAT CSV)" % (
+            table, ', '.join(columns))
+        try:
+            start = perf()
+            with self._conn.connection.cursor() as cursor:
+                cursor.copy_expert(sql, buf)
+            Stats.log_db(sql, perf() - start)
+        except Exception as e:
+            log.warning("[SQL-ERR] %s in copy %s",
+                        e.__class__.__name__, sql)
+            raise e
+
+    def copy_out(self, sql):
+        """Bulk-read the result of a `SELECT n*m` as an iterable of tuples.
+
+        On postgres, rows are streamed through `COPY (...) TO STDOUT`
+        and parsed by the csv module, skipping per-row driver/ORM
+        overhead; every value comes back as a str (NULL as ''), so
+        callers must convert types. Other engines use `query_all`.
+        """
+        if self.engine_name() != 'postgresql':
+            return self.query_all(sql)
+
+        buf = io.StringIO()
+        sql = "COPY (%s) TO STDOUT WITH (FORMAT CSV)" % sql
+        try:
+            start = perf()
+            with self._conn.connection.cursor() as cursor:
+                cursor.copy_expert(sql, buf)
+            Stats.log_db(sql, perf() - start)
+        except Exception as e:
+            log.warning("[SQL-ERR] %s in copy %s",
+                        e.__class__.__name__, sql)
+            raise e
+
+        buf.seek(0)
+        return csv.reader(buf)
+
+    def prepared(self, sql):
+        """Get an `EXECUTE` stmt which runs `sql` as a server-side prepared
+        statement; usable in place of `sql` with any `query_*` method.
+
+        On first use `sql` is sent once as `PREPARE`, so repeated calls
+        skip server-side parse/plan. Meant for hot, fixed SELECTs. Binds
+        are parsed by sqlalchemy as for any other query; expanding binds
+        (`IN :tuple`) are not supported.
+        """
+        # prepared stmts live in the db session; drop them on reconnect
+        dbapi_conn = self._conn.connection.connection
+        if dbapi_conn is not self._prepared_conn:
+            self._prepared = {}
+            self._prepared_src = {}
+            self._prepared_conn = dbapi_conn
+
+        if sql in self._prepared:
+            return self._prepared[sql]
+        if self.engine_name() != 'postgresql':
+            return sql
+
+        name = 'hive_stmt_%d' % len(self._prepared)
+        body, names = _positional_sql(self._sql_text(sql), self._conn.dialect)
+        prepare = "PREPARE %s AS %s" % (name, body)
+        try:
+            start = perf()
+            with dbapi_conn.cursor() as cursor:
+                cursor.execute(prepare)
+            Stats.log_db(prepare, perf() - start)
+        except Exception as e:
+            log.warning("[SQL-ERR] %s in query %s",
+                        e.__class__.__name__, prepare)
+            raise e
+
+        args = ', '.join(':' + n for n in names)
+        stmt = "EXECUTE %s(%s)" % (name, args) if names else "EXECUTE " + name
+        self._prepared[sql] = stmt
+        self._prepared_src[stmt] = sql
+        return stmt
+
     @staticmethod
     def build_insert(table, values, pk=None):
         """Generates an INSERT statement w/ bindings."""
@@ -174,7 +298,8 @@ class Db:
             start = perf()
             query = self._sql_text(sql)
             result = self._exec(query, **kwargs)
-            Stats.log_db(sql, perf() - start)
+            # report prepared stmts by their source sql
+            Stats.log_db(self._prepared_src.get(sql, sql), perf() - start)
             return result
         except Exception as e:
             log.warning("[SQL-ERR] %s in query %s (%s)",
@@ -184,10 +309,13 @@ class Db:
     @staticmethod
     def _is_write_query(sql):
         """Check if `sql` is a DELETE, UPDATE, COMMIT, ALTER, etc."""
-        action = sql.strip()[0:6].strip()
+        # only the head matters; unlike strip(), this does not copy
+        # (possibly huge) queries which end in whitespace
+        action = sql.lstrip()[0:6].strip()
         if action == 'SELECT':
             return False
-        if action in ['DELETE', 'UPDATE', 'INSERT', 'COMMIT', 'START',
-                      'ALTER', 'TRUNCA', 'CREATE', 'DROP I', 'DROP T']:
+        if action in {'DELETE', 'UPDATE', 'INSERT', 'COMMIT', 'START',
+                      'ALTER', 'TRUNCA', 'CREATE', 'DROP I', 'DROP T',
+                      'SET LO'}:
             return True
         raise Exception("unknown action: {}".format(sql))
@@ -330,6 +330,6 @@ class DbState:
         """Sets the db/schema version number. Enforce sequential."""
         assert cls._ver is not None, 'version needs to be read before updating'
         assert ver == cls._ver + 1, 'version must follow previous'
-        cls.db().query("UPDATE hive_state SET db_version = %d" % ver)
+        cls.db().query("UPDATE hive_state SET db_version = :ver", ver=ver)
         cls._ver = ver
         log.info("[HIVE] db migrated to version: %d", ver)
@@ -1,5 +1,7 @@
 """Db schema definitions and setup routines."""
 
+from functools import lru_cache
+
 import sqlalchemy as sa
 from sqlalchemy.sql import text as sql_text
 from sqlalchemy.types import SMALLINT
@@ -12,8 +14,9 @@ from sqlalchemy.types import BOOLEAN
 
 DB_VERSION = 17
 
+@lru_cache(maxsize=1)
 def build_metadata():
-    """Build schema def with SqlAlchemy"""
+    """Build schema def with SqlAlchemy. Built once, then shared."""
     metadata = sa.MetaData()
 
     sa.Table(
@@ -2,6 +2,7 @@
 
 import logging
 
+from array import array
 from datetime import datetime
 from toolz import partition_all
 
@@ -26,8 +27,8 @@ class Accounts:
     # fifo queue
     _dirty = UniqueFIFO()
 
-    # in-mem id->rank map
-    _ranks = {}
+    # in-mem id->rank map; indexed by id, 0 if unranked
+    _ranks = array('L')
 
     # account core methods
     # --------------------
@@ -36,7 +37,8 @@ class Accounts:
     def load_ids(cls):
         """Load a full (name: id) dict into memory."""
         assert not cls._ids, "id map already loaded"
-        cls._ids = dict(DB.query_all("SELECT name, id FROM hive_accounts"))
+        rows = DB.copy_out("SELECT name, id FROM hive_accounts")
+        cls._ids = {name: int(_id) for name, _id in rows}
 
     @classmethod
     def clear_ids(cls):
@@ -47,7 +49,7 @@ class Accounts:
     def default_score(cls, name):
         """Return default notification score based on rank."""
         _id = cls.get_id(name)
-        rank = cls._ranks[_id] if _id in cls._ranks else 1000000
+        rank = cls._rank(_id) or 1000000
         if rank < 200: return 70    # 0.02% 100k
         if rank < 1000: return 60   # 0.1%  10k
         if rank < 6500: return 50   # 0.5%  1k
@@ -77,17 +79,16 @@ class Accounts:
         """
 
         # filter out names which already registered
-        new_names = list(filter(lambda n: not cls.exists(n), set(names)))
+        new_names = [name for name in set(names) if name not in cls._ids]
         if not new_names:
             return
 
-        for name in new_names:
-            DB.query("INSERT INTO hive_accounts (name, created_at) "
-                     "VALUES (:name, :date)", name=name, date=block_date)
-
-        # pull newly-inserted ids and merge into our map
-        sql = "SELECT name, id FROM hive_accounts WHERE name IN :names"
-        for name, _id in DB.query_all(sql, names=tuple(new_names)):
+        # insert all names at once; merge returned ids into our map
+        params = {'name_%d' % i: name for i, name in enumerate(new_names)}
+        values = ', '.join('(:%s, :date)' % key for key in params)
+        sql = ("INSERT INTO hive_accounts (name, created_at) VALUES %s "
+               "RETURNING name, id" % values)
+        for name, _id in DB.query(sql, date=block_date, **params):
             cls._ids[name] = _id
 
         # post-insert: pass to communities to check for new registrations
@@ -142,8 +143,18 @@ class Accounts:
     def fetch_ranks(cls):
         """Rebuild account ranks and store in memory for next update."""
         sql = "SELECT id FROM hive_accounts ORDER BY vote_weight DESC"
-        for rank, _id in enumerate(DB.query_col(sql)):
-            cls._ranks[_id] = rank + 1
+        ids = [int(_id) for (_id,) in DB.copy_out(sql)]
+        ranks = array('L', [0]) * (max(ids, default=0) + 1)
+        for rank, _id in enumerate(ids):
+            ranks[_id] = rank + 1
+        cls._ranks = ranks
+
+    @classmethod
+    def _rank(cls, _id):
+        """Get an account's rank as of last `fetch_ranks`, or None."""
+        if _id < len(cls._ranks):
+            return cls._ranks[_id] or None
+        return None
 
     @classmethod
     def _cache_accounts(cls, accounts, steem, trx=True):
@@ -160,7 +171,7 @@ class Accounts:
             DB.batch_queries(sqls, trx)
 
             timer.batch_finish(len(batch))
-            if trx or len(accounts) > 1000:
+            if (trx or len(accounts) > 1000) and log.isEnabledFor(logging.INFO):
                 log.info(timer.batch_status())
 
     @classmethod
@@ -215,9 +226,9 @@ class Accounts:
             'raw_json': json.dumps(account)}
 
         # update rank field, if present
-        _id = cls.get_id(account['name'])
-        if _id in cls._ranks:
-            values['rank'] = cls._ranks[_id]
+        rank = cls._rank(cls.get_id(account['name']))
+        if rank:
+            values['rank'] = rank
 
         bind = ', '.join([k+" = :"+k for k in list(values.keys())][1:])
         return ("UPDATE hive_accounts SET %s WHERE name = :name" % bind, values)
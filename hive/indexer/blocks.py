@@ -1,5 +1,6 @@
 """Blocks processor."""
 
+import gc
 import logging
 
 from hive.db.adapter import Db
@@ -7,7 +8,7 @@ from hive.db.adapter import Db
 from hive.indexer.accounts import Accounts
 from hive.indexer.posts import Posts
 from hive.indexer.cached_post import CachedPost
-from hive.indexer.custom_op import CustomOp
+from hive.indexer.custom_op import CustomOp, HANDLED_IDS as CUSTOM_JSON_IDS
 from hive.indexer.payments import Payments
 from hive.indexer.follow import Follow
 
@@ -15,104 +16,186 @@ log = logging.getLogger(__name__)
 
 DB = Db.instance()
 
+_BLOCK_COLS = ('num', 'hash', 'prev', 'txs', 'ops', 'created_at')
+
+# op handlers, called as `handler(op, tx_idx, num, date)`
+#pylint: disable=unused-argument
+
+def _account_update_op(op, tx_idx, num, date):
+    Accounts.dirty(op['account']) # full
+
+def _comment_op(op, tx_idx, num, date):
+    Posts.comment_op(op, date)
+
+def _comment_op_live(op, tx_idx, num, date):
+    Posts.comment_op(op, date)
+    Accounts.dirty(op['author']) # lite - stats
+
+def _delete_comment_op(op, tx_idx, num, date):
+    Posts.delete_op(op)
+
+def _vote_op(op, tx_idx, num, date):
+    Accounts.dirty(op['author']) # lite - rep
+    Accounts.dirty(op['voter']) # lite - stats
+    CachedPost.vote(op['author'], op['permlink'],
+                    None, op['voter'])
+
+def _transfer_op(op, tx_idx, num, date):
+    Payments.op_transfer(op, tx_idx, num, date)
+
+#pylint: enable=unused-argument
+
+# initial sync skips account/post cache upkeep, which is rebuilt after
+_INITIAL_OP_HANDLERS = {
+    # post ops
+    'comment_operation': _comment_op,
+    'delete_comment_operation': _delete_comment_op,
+
+    # misc ops
+    'transfer_operation': _transfer_op,
+}
+
+_LIVE_OP_HANDLERS = {
+    # account metadata updates
+    'account_update_operation': _account_update_op,
+    'account_update2_operation': _account_update_op,
+
+    # post ops
+    'comment_operation': _comment_op_live,
+    'delete_comment_operation': _delete_comment_op,
+    'vote_operation': _vote_op,
+
+    # misc ops
+    'transfer_operation': _transfer_op,
+}
+
+# account ops: op type -> candidate new account name
+_NEW_ACCOUNT_OPS = {
+    'pow_operation': lambda op: op['worker_account'],
+    'pow2_operation': lambda op: op['work']['value']['input']['worker_account'],
+    'account_create_operation': lambda op: op['new_account_name'],
+    'account_create_with_delegation_operation': lambda op: op['new_account_name'],
+    'create_claimed_account_operation': lambda op: op['new_account_name'],
+}
+
 class Blocks:
     """Processes blocks, dispatches work, manages `hive_blocks` table."""
 
+    # pending `hive_blocks` rows, one list per column; see `_flush_blocks`
+    blocks_to_flush = {col: [] for col in _BLOCK_COLS}
+
+    # head block num/date; loaded from db on first use, then tracked
+    _head_num = None
+    _head_date = None
+
     @classmethod
     def head_num(cls):
         """Get hive's head block number."""
-        sql = "SELECT num FROM hive_blocks ORDER BY num DESC LIMIT 1"
-        return DB.query_one(sql) or 0
+        if cls._head_num is None:
+            cls._load_head()
+        return cls._head_num
 
     @classmethod
     def head_date(cls):
         """Get hive's head block date."""
-        sql = "SELECT created_at FROM hive_blocks ORDER BY num DESC LIMIT 1"
-        return str(DB.query_one(sql) or '')
+        if cls._head_date is None:
+            cls._load_head()
+        return cls._head_date
+
+    @classmethod
+    def _load_head(cls):
+        """Load head block num and date from db in a single query."""
+        sql = "SELECT num, created_at FROM hive_blocks ORDER BY num DESC LIMIT 1"
+        row = DB.query_row(sql)
+        cls._head_num = row['num'] if row else 0
+        cls._head_date = str(row['created_at']) if row else ''
 
     @classmethod
     def process(cls, block):
         """Process a single block. Always wrap in a transaction!"""
-        #assert is_trx_active(), "Block.process must be in a trx"
-        return cls._process(block, is_initial_sync=False)
+        return cls.process_chunk([block])
+
+    @classmethod
+    def process_chunk(cls, blocks):
+        """Process consecutive live blocks. Always wrap in a transaction!
+
+        Unlike `process_multi`, transaction handling is left to the
+        caller so that it can flush other modules in the same trx."""
+        num = None
+        for block in blocks:
+            num = cls._process(block, is_initial_sync=False)
+        cls._flush_blocks()
+        return num
 
     @classmethod
     def process_multi(cls, blocks, is_initial_sync=False):
         """Batch-process blocks; wrapped in a transaction."""
         DB.query("START TRANSACTION")
-
-        last_num = 0
+        if is_initial_sync and DB.engine_name() == 'postgresql':
+            # a crash only loses the last few batches, which initial
+            # sync resumes from anyway; don't wait on WAL flush at COMMIT.
+            DB.query("SET LOCAL synchronous_commit = off")
+
+        # op/block dicts are freed by refcount; suspend the cyclic gc
+        # so it does not repeatedly scan the large in-memory id maps
+        # mid-batch. It runs (at most once) soon after re-enabling.
+        gc.disable()
         try:
-            for block in blocks:
-                last_num = cls._process(block, is_initial_sync)
-        except Exception as e:
-            log.error("exception encountered block %d", last_num + 1)
-            raise e
+            last_num = 0
+            try:
+                for block in blocks:
+                    last_num = cls._process(block, is_initial_sync)
+            except Exception as e:
+                log.error("exception encountered block %d", last_num + 1)
+                raise e
 
-        # Follows flushing needs to be atomic because recounts are
-        # expensive. So is tracking follows at all; hence we track
-        # deltas in memory and update follow/er counts in bulk.
-        Follow.flush(trx=False)
+            cls._flush_blocks()
 
-        DB.query("COMMIT")
+            # Follows flushing needs to be atomic because recounts are
+            # expensive. So is tracking follows at all; hence we track
+            # deltas in memory and update follow/er counts in bulk.
+            Follow.flush(trx=False)
+
+            DB.query("COMMIT")
+        finally:
+            gc.enable()
 
     @classmethod
     def _process(cls, block, is_initial_sync=False):
         """Process a single block. Assumes a trx is open."""
-        #pylint: disable=too-many-branches
-        num = cls._push(block)
+        num = int(block['block_id'][:8], base=16)
         date = block['timestamp']
 
         account_names = set()
         json_ops = []
+        op_count = 0
+
+        # local bindings for the per-op loop
+        handlers = _INITIAL_OP_HANDLERS if is_initial_sync else _LIVE_OP_HANDLERS
+        new_account_ops = _NEW_ACCOUNT_OPS
+        add_json_op = json_ops.append
+        custom_json_ids = CUSTOM_JSON_IDS
+        add_account_name = account_names.add
+
         for tx_idx, tx in enumerate(block['transactions']):
-            for operation in tx['operations']:
+            operations = tx['operations']
+            op_count += len(operations)
+            for operation in operations:
                 op_type = operation['type']
                 op = operation['value']
 
-                # account ops
-                if op_type == 'pow_operation':
-                    account_names.add(op['worker_account'])
-                elif op_type == 'pow2_operation':
-                    account_names.add(op['work']['value']['input']['worker_account'])
-                elif op_type == 'account_create_operation':
-                    account_names.add(op['new_account_name'])
-                elif op_type == 'account_create_with_delegation_operation':
-                    account_names.add(op['new_account_name'])
-                elif op_type == 'create_claimed_account_operation':
-                    account_names.add(op['new_account_name'])
-
-                # account metadata updates
-                elif op_type == 'account_update_operation':
-                    if not is_initial_sync:
-                        Accounts.dirty(op['account']) # full
-                elif op_type == 'account_update2_operation':
-                    if not is_initial_sync:
-                        Accounts.dirty(op['account']) # full
-
-                # post ops
-                elif op_type == 'comment_operation':
-                    Posts.comment_op(op, date)
-                    if not is_initial_sync:
-                        Accounts.dirty(op['author']) # lite - stats
-                elif op_type == 'delete_comment_operation':
-                    Posts.delete_op(op)
-                elif op_type == 'vote_operation':
-                    if not is_initial_sync:
-                        Accounts.dirty(op['author']) # lite - rep
-                        Accounts.dirty(op['voter']) # lite - stats
-                        CachedPost.vote(op['author'], op['permlink'],
-                                        None, op['voter'])
-
-                # misc ops
-                elif op_type == 'transfer_operation':
-                    Payments.op_transfer(op, tx_idx, num, date)
-                elif op_type == 'custom_json_operation':
-                    json_ops.append(op)
+                if op_type == 'custom_json_operation':
+                    if op['id'] in custom_json_ids:
+                        add_json_op(op)
+                elif op_type in handlers:
+                    handlers[op_type](op, tx_idx, num, date)
+                elif op_type in new_account_ops:
+                    add_account_name(new_account_ops[op_type](op))
 
         Accounts.register(account_names, date)     # register any new names
         CustomOp.process_ops(json_ops, num, date)  # follow/reblog/community ops
 
+        cls._push(block, num, op_count)
         return num
 
     @classmethod
@@ -122,13 +205,18 @@ class Blocks:
         if not hive_head:
             return
 
+        # fetch the top 25 blocks from hive and steem in one go, then
         # move backwards from head until hive/steem agree
+        lbound = max(1, hive_head - 24)
+        hive_blocks = cls._get_range(lbound, hive_head)
+        steem_blocks = steem.get_blocks_range(lbound, hive_head + 1)
+
         to_pop = []
         cursor = hive_head
-        while True:
-            assert hive_head - cursor < 25, "fork too deep"
-            hive_block = cls._get(cursor)
-            steem_hash = steem.get_block(cursor)['block_id']
+        match = False
+        for hive_block, steem_block in zip(reversed(hive_blocks),
+                                           reversed(steem_blocks)):
+            steem_hash = steem_block['block_id']
             match = hive_block['hash'] == steem_hash
             log.info("[INIT] fork check. block %d: %s vs %s --- %s",
                      hive_block['num'], hive_block['hash'],
@@ -137,6 +225,7 @@ class Blocks:
                 break
             to_pop.append(hive_block)
             cursor -= 1
+        assert match, "fork too deep"
 
         if hive_head == cursor:
             return # no fork!
@@ -151,26 +240,38 @@ class Blocks:
         cls._pop(to_pop)
 
     @classmethod
-    def _get(cls, num):
-        """Fetch a specific block."""
+    def _get_range(cls, lbound, ubound):
+        """Fetch blocks in the range of [lbound, ubound], ascending."""
         sql = """SELECT num, created_at date, hash
-                 FROM hive_blocks WHERE num = :num LIMIT 1"""
-        return dict(DB.query_row(sql, num=num))
+                 FROM hive_blocks WHERE num BETWEEN :lbound AND :ubound
+                 ORDER BY num"""
+        return [dict(row) for row in
+                DB.query_all(sql, lbound=lbound, ubound=ubound)]
 
     @classmethod
-    def _push(cls, block):
-        """Insert a row in `hive_blocks`."""
-        num = int(block['block_id'][:8], base=16)
-        txs = block['transactions']
-        DB.query("INSERT INTO hive_blocks (num, hash, prev, txs, ops, created_at) "
-                 "VALUES (:num, :hash, :prev, :txs, :ops, :date)", **{
-                     'num': num,
-                     'hash': block['block_id'],
-                     'prev': block['previous'],
-                     'txs': len(txs),
-                     'ops': sum([len(tx['operations']) for tx in txs]),
-                     'date': block['timestamp']})
-        return num
+    def _push(cls, block, num, op_count):
+        """Queue a row for `hive_blocks`; written on `_flush_blocks`."""
+        cols = cls.blocks_to_flush
+        cols['num'].append(num)
+        cols['hash'].append(block['block_id'])
+        cols['prev'].append(block['previous'])
+        cols['txs'].append(len(block['transactions']))
+        cols['ops'].append(op_count)
+        cols['created_at'].append(block['timestamp'])
+        cls._head_num = num
+        # same format as the db-loaded value, str(datetime); chain
+        # timestamps are second-precision, so only the `T` differs
+        cls._head_date = block['timestamp'].replace('T', ' ')
+
+    @classmethod
+    def _flush_blocks(cls):
+        """Bulk-insert all queued `hive_blocks` rows."""
+        cols = cls.blocks_to_flush
+        if not cols['num']:
+            return
+        rows = zip(*[cols[col] for col in _BLOCK_COLS])
+        DB.copy_rows('hive_blocks', _BLOCK_COLS, rows)
+        cls.blocks_to_flush = {col: [] for col in _BLOCK_COLS}
 
     @classmethod
     def _pop(cls, blocks):
@@ -196,36 +297,41 @@ class Blocks:
         """
         DB.query("START TRANSACTION")
 
+        # blocks are ordered head-first and must be contiguous, so
+        # clearing everything from the oldest one pops them all at once.
+        nums = [block['num'] for block in blocks]
+        assert nums[0] == cls.head_num(), "can only pop head block"
+        assert nums == list(range(nums[0], nums[0] - len(nums), -1)), "gap in popped blocks"
         for block in blocks:
-            num = block['num']
-            date = block['date']
-            log.warning("[FORK] popping block %d @ %s", num, date)
-            assert num == cls.head_num(), "can only pop head block"
-
-            # get all affected post_ids in this block
-            sql = "SELECT id FROM hive_posts WHERE created_at >= :date"
-            post_ids = tuple(DB.query_col(sql, date=date))
-
-            # remove all recent records -- communities
-            DB.query("DELETE FROM hive_notifs        WHERE created_at >= :date", date=date)
-            DB.query("DELETE FROM hive_subscriptions WHERE created_at >= :date", date=date)
-            DB.query("DELETE FROM hive_roles         WHERE created_at >= :date", date=date)
-            DB.query("DELETE FROM hive_communities   WHERE created_at >= :date", date=date)
-
-            # remove all recent records -- core
-            DB.query("DELETE FROM hive_feed_cache  WHERE created_at >= :date", date=date)
-            DB.query("DELETE FROM hive_reblogs     WHERE created_at >= :date", date=date)
-            DB.query("DELETE FROM hive_follows     WHERE created_at >= :date", date=date) #*
-
-            # remove posts: core, tags, cache entries
-            if post_ids:
-                DB.query("DELETE FROM hive_posts_cache WHERE post_id IN :ids", ids=post_ids)
-                DB.query("DELETE FROM hive_post_tags   WHERE post_id IN :ids", ids=post_ids)
-                DB.query("DELETE FROM hive_posts       WHERE id      IN :ids", ids=post_ids)
-
-            DB.query("DELETE FROM hive_payments    WHERE block_num = :num", num=num)
-            DB.query("DELETE FROM hive_blocks      WHERE num = :num", num=num)
+            log.warning("[FORK] popping block %d @ %s", block['num'], block['date'])
+
+        num = nums[-1]
+        date = blocks[-1]['date']
+
+        # remove all recent records -- communities
+        DB.query("DELETE FROM hive_notifs        WHERE created_at >= :date", date=date)
+        DB.query("DELETE FROM hive_subscriptions WHERE created_at >= :date", date=date)
+        DB.query("DELETE FROM hive_roles         WHERE created_at >= :date", date=date)
+        DB.query("DELETE FROM hive_communities   WHERE created_at >= :date", date=date)
+
+        # remove all recent records -- core
+        DB.query("DELETE FROM hive_feed_cache  WHERE created_at >= :date", date=date)
+        DB.query("DELETE FROM hive_reblogs     WHERE created_at >= :date", date=date)
+        DB.query("DELETE FROM hive_follows     WHERE created_at >= :date", date=date) #*
+
+        # payments reference posts (fk), so remove them first
+        DB.query("DELETE FROM hive_payments    WHERE block_num >= :num", num=num)
+
+        # remove posts: core, tags, cache entries
+        post_ids = "SELECT id FROM hive_posts WHERE created_at >= :date"
+        DB.query("DELETE FROM hive_posts_cache WHERE post_id IN (%s)" % post_ids, date=date)
+        DB.query("DELETE FROM hive_post_tags   WHERE post_id IN (%s)" % post_ids, date=date)
+        DB.query("DELETE FROM hive_posts       WHERE created_at >= :date", date=date)
+
+        DB.query("DELETE FROM hive_blocks      WHERE num >= :num", num=num)
 
         DB.query("COMMIT")
+        cls._head_num = None
+        cls._head_date = None
         log.warning("[FORK] recovery complete")
         # TODO: manually re-process here the blocks which were just popped.
@@ -22,6 +22,7 @@ DB = Db.instance()
 
 # levels of post dirtiness, in order of decreasing priority
 LEVELS = ['insert', 'payout', 'update', 'upvote', 'recount']
+LEVEL_MODES = {level: mode for mode, level in enumerate(LEVELS)}
 
 def _keyify(items):
     return dict(map(lambda x: ("val_%d" % x[0], x[1]), enumerate(items)))
@@ -45,7 +46,7 @@ class CachedPost:
     _pending_promoted = {}
 
     # pending vote notifs {pid: [voters]}
-    _votes = {}
+    _votes = collections.defaultdict(list)
 
     @classmethod
     def update_promoted_amount(cls, post_id, amount):
@@ -54,9 +55,8 @@ class CachedPost:
 
     @classmethod
     def _dirty(cls, level, author, permlink, pid=None):
-        """Mark a post as dirty."""
-        assert level in LEVELS, "invalid level {}".format(level)
-        mode = LEVELS.index(level)
+        """Mark a post as dirty. Returns its `author/permlink` key."""
+        mode = LEVEL_MODES[level] # KeyError on invalid level
         url = author + '/' + permlink
 
         # add to appropriate queue.
@@ -74,6 +74,8 @@ class CachedPost:
         else:
             cls._noids.add(url)
 
+        return url
+
     @classmethod
     def _get_id(cls, url):
         """Given a post url, get its id."""
@@ -89,11 +91,8 @@ class CachedPost:
     @classmethod
     def vote(cls, author, permlink, pid=None, voter=None):
         """Handle a post dirtied by a `vote` op."""
-        cls._dirty('upvote', author, permlink, pid)
+        url = cls._dirty('upvote', author, permlink, pid)
         if voter:
-            url = author + '/' + permlink
-            if url not in cls._votes:
-                cls._votes[url] = []
             cls._votes[url].append(voter)
 
     @classmethod
@@ -204,7 +203,7 @@ class CachedPost:
         returns a list of tuples to be passed to _update_batch, in the
         form of: `[(url, id, level)*]`
         """
-        mode = LEVELS.index(level)
+        mode = LEVEL_MODES[level]
         urls = [url for url, i in cls._queue.items() if i == mode]
         if fraction > 1 and level != 'insert': # inserts must be full flush
             urls = urls[0:math.ceil(len(urls) / fraction)]
@@ -386,7 +385,7 @@ class CachedPost:
             DB.batch_queries(buffer, trx)
 
             timer.batch_finish(len(posts))
-            if len(tuples) >= 1000:
+            if len(tuples) >= 1000 and log.isEnabledFor(logging.INFO):
                 log.info(timer.batch_status())
 
     @classmethod
@@ -584,7 +583,7 @@ class CachedPost:
             elif score < 60: max_mentions = 10
             else: max_mentions = 25
             if len(accounts) <= max_mentions:
-                penalty = min([score, 2 * (len(accounts) - 1)])
+                penalty = min(score, 2 * (len(accounts) - 1))
                 for mention in accounts:
                     mention_id = Accounts.get_id(mention)
                     if (not cls._mentioned(pid, mention_id)
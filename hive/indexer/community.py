@@ -598,8 +598,8 @@ class CommunityOp:
 
     def _parent_muted(self):
         """Check parent post's muted status."""
-        parent_id = "SELECT parent_id FROM hive_posts WHERE id = :id"
-        sql = "SELECT is_muted FROM hive_posts WHERE id = (%s)" % parent_id
+        sql = """SELECT is_muted FROM hive_posts WHERE id = (
+                   SELECT parent_id FROM hive_posts WHERE id = :id)"""
         return bool(DB.query_one(sql, id=self.post_id))
 
     def _pinned(self):
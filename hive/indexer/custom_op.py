@@ -19,6 +19,9 @@ DB = Db.instance()
 
 log = logging.getLogger(__name__)
 
+# custom_json op ids which hive handles; others are ignored
+HANDLED_IDS = frozenset(['follow', 'community', 'notify'])
+
 def _get_auth(op):
     """get account name submitting a custom_json op.
 
@@ -41,7 +44,7 @@ class CustomOp:
     def process_ops(cls, ops, block_num, block_date):
         """Given a list of operation in block, filter and process them."""
         for op in ops:
-            if op['id'] not in ['follow', 'community', 'notify']:
+            if op['id'] not in HANDLED_IDS:
                 continue
 
             account = _get_auth(op)
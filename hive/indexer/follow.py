@@ -1,6 +1,7 @@
 """Handles follow operations."""
 
 import logging
+from collections import Counter, defaultdict
 from time import perf_counter as perf
 
 from funcy.seqs import first
@@ -18,12 +19,9 @@ FOLLOWING = 'following'
 
 def _flip_dict(dict_to_flip):
     """Swap keys/values. Returned dict values are array of keys."""
-    flipped = {}
+    flipped = defaultdict(list)
     for key, value in dict_to_flip.items():
-        if value in flipped:
-            flipped[value].append(key)
-        else:
-            flipped[value] = [key]
+        flipped[value].append(key)
     return flipped
 
 class Follow:
@@ -98,7 +96,7 @@ class Follow:
 
     # -- stat tracking --
 
-    _delta = {FOLLOWERS: {}, FOLLOWING: {}}
+    _delta = {FOLLOWERS: Counter(), FOLLOWING: Counter()}
 
     @classmethod
     def follow(cls, follower, following):
@@ -115,8 +113,6 @@ class Follow:
     @classmethod
     def _apply_delta(cls, account, role, direction):
         """Modify an account's follow delta in specified direction."""
-        if not account in cls._delta[role]:
-            cls._delta[role][account] = 0
         cls._delta[role][account] += direction
 
     @classmethod
@@ -127,11 +123,14 @@ class Follow:
         sqls = []
         for col, deltas in cls._delta.items():
             for delta, names in _flip_dict(deltas).items():
+                if not delta:
+                    continue # follow/unfollow cancelled out
                 updated += len(names)
                 sql = "UPDATE hive_accounts SET %s = %s + :mag WHERE id IN :ids"
                 sqls.append((sql % (col, col), dict(mag=delta, ids=tuple(names))))
 
         if not updated:
+            cls._delta = {FOLLOWERS: Counter(), FOLLOWING: Counter()}
             return 0
 
         start = perf()
@@ -140,7 +139,7 @@ class Follow:
             log.info("[SYNC] flushed %d follow deltas in %ds",
                      updated, perf() - start)
 
-        cls._delta = {FOLLOWERS: {}, FOLLOWING: {}}
+        cls._delta = {FOLLOWERS: Counter(), FOLLOWING: Counter()}
         return updated
 
     @classmethod
@@ -25,18 +25,13 @@ class Payments:
         if not record:
             return
 
-        # add payment record
-        sql = DB.build_insert('hive_payments', record, pk='id')
-        DB.query(sql)
-
-        # read current amount
-        sql = "SELECT promoted FROM hive_posts WHERE id = :id"
-        curr_amount = DB.query_one(sql, id=record['post_id'])
-        new_amount = curr_amount + record['amount']
-
-        # update post record
-        sql = "UPDATE hive_posts SET promoted = :val WHERE id = :id"
-        DB.query(sql, val=new_amount, id=record['post_id'])
+        # add payment record and apply it to the post's promoted
+        # balance in a single round-trip; read back the new balance
+        sql, values = DB.build_insert('hive_payments', record, pk='id')
+        sql += (";UPDATE hive_posts SET promoted = promoted + :amount"
+                " WHERE id = :post_id RETURNING promoted")
+        result = DB.query(sql, **values)
+        new_amount = list(result)[0][0]
 
         # notify cached_post of new promoted balance, and trigger update
         if not DbState.is_initial_sync():
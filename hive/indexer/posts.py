@@ -42,7 +42,7 @@ class Posts:
             cls._miss += 1
             sql = """SELECT id FROM hive_posts WHERE
                      author = :a AND permlink = :p"""
-            _id = DB.query_one(sql, a=author, p=permlink)
+            _id = DB.query_one(DB.prepared(sql), a=author, p=permlink)
             if _id:
                 cls._set_id(url, _id)
 
@@ -78,14 +78,15 @@ class Posts:
         _id = cls.get_id(author, permlink)
         if not _id:
             return (None, -1)
-        depth = DB.query_one("SELECT depth FROM hive_posts WHERE id = :id", id=_id)
+        sql = "SELECT depth FROM hive_posts WHERE id = :id"
+        depth = DB.query_one(DB.prepared(sql), id=_id)
         return (_id, depth)
 
     @classmethod
     def is_pid_deleted(cls, pid):
         """Check if the state of post is deleted."""
         sql = "SELECT is_deleted FROM hive_posts WHERE id = :id"
-        return DB.query_one(sql, id=pid)
+        return DB.query_one(DB.prepared(sql), id=pid)
 
     @classmethod
     def delete_op(cls, op):
@@ -230,7 +231,7 @@ class Posts:
             sql = """SELECT depth, category, community_id, is_valid, is_muted
                        FROM hive_posts WHERE id = :id"""
             (parent_depth, category, community_id, is_valid,
-             is_muted) = DB.query_row(sql, id=parent_id)
+             is_muted) = DB.query_row(DB.prepared(sql), id=parent_id)
             depth = parent_depth + 1
             if not is_valid: error = 'replying to invalid post'
             elif is_muted: error = 'replying to muted post'
@@ -2,7 +2,10 @@
 
 import logging
 import glob
-from time import perf_counter as perf
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from threading import Thread
+from time import time, perf_counter as perf
 import os
 import ujson as json
 
@@ -11,8 +14,10 @@ from toolz import partition_all
 
 from hive.db.db_state import DbState
 
-from hive.utils.timer import Timer
+from hive.utils.timer import Timer, adapt_batch_size
+from hive.utils.normalize import block_date, utc_timestamp, json_loads
 from hive.steem.block.stream import MicroForkException
+from hive.steem.block.schedule import BlockSchedule
 
 from hive.indexer.blocks import Blocks
 from hive.indexer.accounts import Accounts
@@ -26,6 +31,17 @@ from hive.server.common.mutes import Mutes
 
 log = logging.getLogger(__name__)
 
+# max number of blocks, and secs since last commit, for which blocks
+# are held and committed together while catching up in listen
+LIVE_CHUNK_SIZE = 100
+LIVE_CHUNK_SECS = 1
+
+# from_steemd batch size bounds, and the per-batch processing time
+# it adapts towards (doubling when well under, halving when well over)
+SYNC_BATCH_MIN = 250
+SYNC_BATCH_MAX = 4000
+SYNC_BATCH_SECS = 10
+
 class Sync:
     """Manages the sync/index process.
 
@@ -36,22 +52,25 @@ class Sync:
         self._conf = conf
         self._db = conf.db()
         self._steem = conf.steem()
+        self._batch_size = None
 
     def run(self):
         """Initialize state; setup/recovery checks; sync and runloop."""
 
-        # ensure db schema up to date, check app status
-        DbState.initialize()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            # load irredeemables over http while the db is prepared
+            mutes = pool.submit(Mutes,
+                                self._conf.get('muted_accounts_url'),
+                                self._conf.get('blacklist_api_url'))
+
+            # ensure db schema up to date, check app status
+            DbState.initialize()
 
-        # prefetch id->name and id->rank memory maps
-        Accounts.load_ids()
-        Accounts.fetch_ranks()
+            # prefetch id->name and id->rank memory maps
+            Accounts.load_ids()
+            Accounts.fetch_ranks()
 
-        # load irredeemables
-        mutes = Mutes(
-            self._conf.get('muted_accounts_url'),
-            self._conf.get('blacklist_api_url'))
-        Mutes.set_shared_instance(mutes)
+            Mutes.set_shared_instance(mutes.result())
 
         # community stats
         Community.recalc_pending_payouts()
@@ -133,7 +152,7 @@ class Sync:
                     skip_lines = last_block - last_read
                     remaining = drop(skip_lines, f)
                     for lines in partition_all(chunk_size, remaining):
-                        Blocks.process_multi(map(json.loads, lines), True)
+                        Blocks.process_multi(map(json_loads, lines), True)
                 last_block = num
             last_read = num
 
@@ -149,22 +168,28 @@ class Sync:
 
         log.info("[SYNC] start block %d, +%d to sync", lbound, count)
         timer = Timer(count, entity='block', laps=['rps', 'wps'])
+
+        self._batch_size = chunk_size
+        batches = self._prefetch_batches(lbound, ubound)
+        log_info = log.isEnabledFor(logging.INFO)
         while lbound < ubound:
             timer.batch_start()
 
             # fetch blocks
-            to = min(lbound + chunk_size, ubound)
-            blocks = steemd.get_blocks_range(lbound, to)
-            lbound = to
+            blocks = next(batches)
+            lbound += len(blocks)
             timer.batch_lap()
 
             # process blocks
+            start = perf()
             Blocks.process_multi(blocks, is_initial_sync)
             timer.batch_finish(len(blocks))
+            self._adapt_batch_size(len(blocks), perf() - start)
 
-            _prefix = ("[SYNC] Got block %d @ %s" % (
-                to - 1, blocks[-1]['timestamp']))
-            log.info(timer.batch_status(_prefix))
+            if log_info:
+                _prefix = ("[SYNC] Got block %d @ %s" % (
+                    lbound - 1, blocks[-1]['timestamp']))
+                log.info(timer.batch_status(_prefix))
 
         if not is_initial_sync:
             # This flush is low importance; accounts are swept regularly.
@@ -176,6 +201,42 @@ class Sync:
             # is already paid out, worst case is to lose an edit.
             CachedPost.flush(steemd, trx=True)
 
+    def _adapt_batch_size(self, count, secs):
+        """Grow/shrink from_steemd batch size based on last batch's time."""
+        size = adapt_batch_size(self._batch_size, count, secs, SYNC_BATCH_SECS,
+                                (SYNC_BATCH_MIN, SYNC_BATCH_MAX))
+        if size != self._batch_size:
+            log.info("[SYNC] batch of %d took %.1fs; batch size now %d",
+                     count, secs, size)
+            self._batch_size = size
+
+    def _prefetch_batches(self, lbound, ubound, depth=2):
+        """Yield block batches in [lbound, ubound) in order.
+
+        Batches are fetched by a producer thread which stays up to
+        `depth` batches ahead, so fetching overlaps with processing.
+        Each fetch uses the current `_batch_size`."""
+        batches = queue.Queue(maxsize=depth)
+
+        def _produce():
+            try:
+                start = lbound
+                while start < ubound:
+                    end = min(start + self._batch_size, ubound)
+                    batches.put(self._steem.get_blocks_range(start, end))
+                    start = end
+            except Exception as e: # pylint: disable=broad-except
+                batches.put(e)
+
+        Thread(target=_produce, name='block-prefetch', daemon=True).start()
+        remaining = ubound - lbound
+        while remaining > 0:
+            blocks = batches.get()
+            if isinstance(blocks, Exception):
+                raise blocks
+            remaining -= len(blocks)
+            yield blocks
+
     def listen(self):
         """Live (block following) mode."""
         trail_blocks = self._conf.get('trail_blocks')
@@ -188,36 +249,69 @@ class Sync:
         steemd = self._steem
         hive_head = Blocks.head_num()
 
+        # while catching up, blocks which are already available are
+        # grouped and committed together; at head, each block commits.
+        lag_secs = (trail_blocks + 3) * BlockSchedule.BLOCK_INTERVAL
+
+        # the chunk's clock starts at the last commit, so a block which
+        # arrives at a steady pace (e.g. from a lagging node) is not held
+        chunk = []
+        chunk_start = perf()
         for block in steemd.stream_blocks(hive_head + 1, trail_blocks, max_gap):
-            start_time = perf()
+            chunk.append(block)
+            if (len(chunk) < LIVE_CHUNK_SIZE
+                    and perf() - chunk_start < LIVE_CHUNK_SECS
+                    and time() - utc_timestamp(block_date(block)) > lag_secs):
+                continue
+
+            self._process_live_chunk(chunk)
+            chunk = []
+            chunk_start = perf()
 
-            self._db.query("START TRANSACTION")
-            num = Blocks.process(block)
-            follows = Follow.flush(trx=False)
-            accts = Accounts.flush(steemd, trx=False, spread=8)
-            CachedPost.dirty_paidouts(block['timestamp'])
-            cnt = CachedPost.flush(steemd, trx=False)
-            self._db.query("COMMIT")
+        if chunk:
+            self._process_live_chunk(chunk)
 
+    def _process_live_chunk(self, blocks):
+        """Process blocks in one trx, then run any due periodic tasks."""
+        steemd = self._steem
+        start_time = perf()
+        block = blocks[-1]
+
+        self._db.query("START TRANSACTION")
+        num = Blocks.process_chunk(blocks)
+        follows = Follow.flush(trx=False)
+        # drain dirty accts at the same per-block rate as 1 block/trx
+        spread = max(1, 8 // len(blocks))
+        accts = Accounts.flush(steemd, trx=False, spread=spread)
+        CachedPost.dirty_paidouts(block['timestamp'])
+        cnt = CachedPost.flush(steemd, trx=False)
+        self._db.query("COMMIT")
+
+        if log.isEnabledFor(logging.INFO):
             ms = (perf() - start_time) * 1000
-            log.info("[LIVE] Got block %d at %s --% 4d txs,% 3d posts,% 3d edits,"
-                     "% 3d payouts,% 3d votes,% 3d counts,% 3d accts,% 3d follows"
-                     " --% 5dms%s", num, block['timestamp'], len(block['transactions']),
-                     cnt['insert'], cnt['update'], cnt['payout'], cnt['upvote'],
+            txs = sum(len(b['transactions']) for b in blocks)
+            log.info("[LIVE] Got block %d at %s --% 3d blocks,% 4d txs,% 3d posts,"
+                     "% 3d edits,% 3d payouts,% 3d votes,% 3d counts,% 3d accts,"
+                     "% 3d follows --% 5dms%s", num, block['timestamp'], len(blocks),
+                     txs, cnt['insert'], cnt['update'], cnt['payout'], cnt['upvote'],
                      cnt['recount'], accts, follows, ms, ' SLOW' if ms > 1000 else '')
 
-            if num % 1200 == 0: #1hr
-                log.warning("head block %d @ %s", num, block['timestamp'])
-                log.info("[LIVE] hourly stats")
-                Accounts.fetch_ranks()
-                #Community.recalc_pending_payouts()
-            if num % 200 == 0: #10min
-                Community.recalc_pending_payouts()
-            if num % 100 == 0: #5min
-                log.info("[LIVE] 5-min stats")
-                Accounts.dirty_oldest(500)
-            if num % 20 == 0: #1min
-                self._update_chain_state()
+        # periodic tasks are due if an interval boundary was crossed
+        first = num - len(blocks) + 1
+        due = lambda interval: num // interval > (first - 1) // interval
+
+        if due(1200): #1hr
+            log.warning("head block %d @ %s", num, block['timestamp'])
+            log.info("[LIVE] hourly stats")
+            Accounts.fetch_ranks()
+            #Community.recalc_pending_payouts()
+        if due(200): #10min
+            Community.recalc_pending_payouts()
+        if due(100): #5min
+            log.info("[LIVE] 5-min stats")
+            Accounts.dirty_oldest(500)
+        if due(20): #1min
+            self._update_chain_state()
 
     # refetch dynamic_global_properties, feed price, etc
     def _update_chain_state(self):
@@ -2,14 +2,25 @@
 
 import logging
 from time import perf_counter as perf
-from urllib.request import urlopen, Request
 import ujson as json
 
+import certifi
+import urllib3
+from urllib3.exceptions import HTTPError
+
 log = logging.getLogger(__name__)
 
+# shared pool; keeps connections (and TLS sessions) open between reloads
+_HTTP = urllib3.PoolManager(
+    headers={'User-Agent': 'Mozilla/5.0'},
+    cert_reqs='CERT_REQUIRED',
+    ca_certs=certifi.where())
+
 def _read_url(url):
-    req = Request(url, headers={'User-Agent': 'Mozilla/5.0'})
-    return urlopen(req).read()
+    response = _HTTP.request('GET', url)
+    if response.status != 200:
+        raise HTTPError(response.status, "non-200 response from %s" % url)
+    return response.data
 
 class Mutes:
     """Singleton tracking muted accounts."""
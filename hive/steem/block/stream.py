@@ -1,6 +1,7 @@
 """Streams incoming blocks from the Steem blockchain."""
 
 import logging
+from collections import deque
 from time import sleep
 from hive.steem.block.schedule import BlockSchedule
 
@@ -54,6 +55,9 @@ class BlockQueue:
 class BlockStream:
     """ETA-based block streamer."""
 
+    # max blocks to request in one batch call when behind head
+    MAX_BATCH = 50
+
     @classmethod
     def stream(cls, client, start_block, min_gap=0, max_gap=100):
         """Instantiates a BlockStream and returns a generator."""
@@ -81,10 +85,23 @@ class BlockStream:
 
         queue = BlockQueue(self._min_gap, prev)
         schedule = BlockSchedule(head)
+        prefetched = deque()
 
         while self._gap_ok(curr, head):
             head = schedule.wait_for_block(curr)
-            block = self._client.get_block(curr, strict=False)
+
+            if prefetched:
+                block = prefetched.popleft()
+            elif head - curr > 2:
+                # when well behind head, fetch available blocks in one call.
+                # expected head is an estimate and may be ahead of the chain,
+                # so take only blocks which exist; if none, retry as usual.
+                ubound = min(head - 1, curr + self.MAX_BATCH)
+                prefetched.extend(self._client.get_blocks_range(
+                    curr, ubound, strict=False))
+                block = prefetched.popleft() if prefetched else None
+            else:
+                block = self._client.get_block(curr, strict=False)
             schedule.check_block(curr, block)
 
             if not block:
@@ -4,7 +4,7 @@ from time import perf_counter as perf
 from decimal import Decimal
 
 from hive.utils.stats import Stats
-from hive.utils.normalize import parse_amount, steem_amount, vests_amount
+from hive.utils.normalize import parse_amount, steem_amount, vests_amount, block_num
 from hive.steem.http_client import HttpClient
 from hive.steem.block.stream import BlockStream
 
@@ -122,19 +122,29 @@ class SteemClient:
         price = (ask + bid) / 2
         return "%.6f" % price
 
-    def get_blocks_range(self, lbound, ubound):
-        """Retrieves blocks in the range of [lbound, ubound)."""
-        block_nums = range(lbound, ubound)
-        blocks = {}
+    def get_blocks_range(self, lbound, ubound, strict=True):
+        """Retrieves blocks in the range of [lbound, ubound).
 
-        batch_params = [{'block_num': i} for i in block_nums]
-        for result in self.__exec_batch('get_block', batch_params):
-            assert 'block' in result, "result w/o block key: %s" % result
-            block = result['block']
-            num = int(block['block_id'][:8], base=16)
-            blocks[num] = block
+        If not `strict`, the range may run past head: only the leading
+        run of blocks which exist is returned (possibly none).
+        """
+        blocks = []
 
-        return [blocks[x] for x in block_nums]
+        batch_params = [{'block_num': i} for i in range(lbound, ubound)]
+        for result in self.__exec_batch('get_block', batch_params):
+            if 'block' not in result:
+                assert not strict, "result w/o block key: %s" % result
+                break # not produced yet; neither are any later blocks
+            blocks.append(result['block'])
+
+        # batch results keep request order (ids are checked per batch),
+        # so only the ends need their block number parsed.
+        assert not strict or len(blocks) == ubound - lbound, "missing blocks in range"
+        if blocks:
+            assert block_num(blocks[0]) == lbound, "range start mismatch"
+            assert block_num(blocks[-1]) == lbound + len(blocks) - 1, "range end mismatch"
+
+        return blocks
 
     def __exec(self, method, params=None):
         """Perform a single steemd call."""
@@ -4,6 +4,7 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 import socket
+from threading import Lock
 from functools import partial
 from itertools import cycle
 from time import sleep, perf_counter as perf
@@ -16,6 +17,7 @@ from urllib3.util import Retry
 from urllib3.connection import HTTPConnection
 from urllib3.exceptions import HTTPError
 
+from hive.utils.normalize import json_loads
 from hive.steem.exceptions import RPCError, RPCErrorFatal
 
 logging.getLogger('urllib3.connectionpool').setLevel(logging.WARNING)
@@ -27,10 +29,10 @@ def validated_json_payload(response):
         raise HTTPError(response.status, "non-200 response")
 
     try:
-        data = response.data.decode('utf-8')
-        payload = json.loads(data)
+        payload = json_loads(response.data)
     except Exception as e:
-        raise Exception("JSON error %s: %s" % (str(e), data[0:1024]))
+        data = response.data[0:1024].decode('utf-8', 'replace')
+        raise Exception("JSON error %s: %s" % (str(e), data))
 
     return payload
 
@@ -116,6 +118,11 @@ class HttpClient(object):
         self.request = None
         self.next_node()
 
+        # thread pool for batch requests, reused across calls
+        self._pool = None
+        self._pool_workers = 0
+        self._pool_lock = Lock()
+
     def next_node(self):
         """Switch to the next available node."""
         self.set_node(next(self.nodes))
@@ -183,17 +190,27 @@ class HttpClient(object):
 
         raise Exception("abort %s after %d tries" % (method, tries))
 
+    def _executor(self, max_workers):
+        """Get the shared thread pool, resized if `max_workers` changed."""
+        with self._pool_lock:
+            if self._pool_workers != max_workers:
+                if self._pool:
+                    self._pool.shutdown(wait=False)
+                self._pool = ThreadPoolExecutor(max_workers=max_workers)
+                self._pool_workers = max_workers
+            return self._pool
+
     def exec_multi(self, name, params, max_workers, batch_size):
         """Process a batch as parallel requests."""
         chunks = [[name, args, True] for args in chunkify(params, batch_size)]
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            for items in executor.map(lambda tup: self.exec(*tup), chunks):
-                yield list(items) # (use of `map` preserves request order)
+        executor = self._executor(max_workers)
+        for items in executor.map(lambda tup: self.exec(*tup), chunks):
+            yield list(items) # (use of `map` preserves request order)
 
     def exec_multi_as_completed(self, name, params, max_workers, batch_size):
         """Process a batch as parallel requests; yields unordered."""
         chunks = [[name, args, True] for args in chunkify(params, batch_size)]
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            futures = (executor.submit(self.exec, *tup) for tup in chunks)
-            for future in as_completed(futures):
-                yield future.result()
+        executor = self._executor(max_workers)
+        futures = [executor.submit(self.exec, *tup) for tup in chunks]
+        for future in as_completed(futures):
+            yield future.result()
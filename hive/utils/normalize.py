@@ -7,6 +7,11 @@ from datetime import datetime
 from pytz import utc
 import ujson as json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 NAI_MAP = {
     '@@000000013': 'HBD',
     '@@000000021': 'HIVE',
@@ -83,6 +88,19 @@ def utc_timestamp(date):
     """Convert datetime to UTC unix timestamp."""
     return date.replace(tzinfo=utc).timestamp()
 
+def json_loads(data):
+    """Parse a JSON str or bytes; uses orjson (faster) if installed.
+
+    orjson is stricter than ujson, e.g. it rejects unpaired surrogate
+    escapes which do occur in chain data; such input is parsed by ujson.
+    """
+    if orjson:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
 def load_json_key(obj, key):
     """Given a dict, parse JSON in `key`. Blank dict on failure."""
     if not obj[key]:
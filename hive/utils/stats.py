@@ -2,12 +2,14 @@
 
 import atexit
 import logging
+from functools import lru_cache
 
 from time import perf_counter as perf
 from hive.utils.system import colorize, peak_usage_mb
 
 log = logging.getLogger(__name__)
 
+@lru_cache(maxsize=4096)
 def _normalize_sql(sql, maxlen=180):
     """Collapse whitespace and middle-truncate if needed."""
     out = ' '.join(sql.split())
@@ -102,9 +104,8 @@ class SteemStats(StatsAbstract):
         par = self.PAR_STEEMD[call]
         over = per / par
         if over >= self.PAR_THRESHOLD:
-            out = ("[STEEM][%dms] %s[%d] -- %.1fx par (%d/%d)"
-                   % (ms, call, batch_size, over, per, par))
-            log.warning(colorize(out))
+            log.warning(colorize("[STEEM][%dms] %s[%d] -- %.1fx par (%d/%d)"),
+                        ms, call, batch_size, over, per, par)
 
 
 class DbStats(StatsAbstract):
@@ -117,8 +118,7 @@ class DbStats(StatsAbstract):
     def check_timing(self, call, ms, batch_size):
         """Warn if any query is slower than defined threshold."""
         if ms > self.SLOW_QUERY_MS:
-            out = "[SQL][%dms] %s" % (ms, call[:250])
-            log.warning(colorize(out))
+            log.warning(colorize("[SQL][%dms] %s"), ms, call[:250])
 
 
 class Stats:
@@ -3,6 +3,22 @@
 from time import perf_counter as perf
 from hive.utils.normalize import secs_to_str
 
+def adapt_batch_size(size, count, secs, target_secs, bounds):
+    """Get the next batch size, given a batch of `count` items took `secs`.
+
+    The time is scaled to a full batch of `size` items (a batch may have
+    been sized before the last change); the size doubles when that is
+    well under `target_secs`, halves when well over, and stays within
+    `bounds` (min, max)."""
+    if not count:
+        return size
+    projected = secs * size / count
+    if projected < target_secs / 2:
+        return min(size * 2, bounds[1])
+    if projected > target_secs * 2:
+        return max(size // 2, bounds[0])
+    return size
+
 class Timer:
     """Times long routines, printing status and ETA.
 
@@ -16,28 +32,25 @@ class Timer:
     """
     #pylint: disable=too-many-instance-attributes
 
-    # Name of entity, lap units (e.g. rps, wps), total items in job
-    _entity = []
-    _lap_units = []
-    _total = None
-    _full_total = None
-    _start_time = None
-
-    # Lap checkpoints, # processed, last # processed
-    _laps = []
-    _processed = 0
-    _last_items = 0
+    __slots__ = ('_entity', '_lap_units', '_total', '_full_total',
+                 '_start_time', '_laps', '_processed', '_last_items')
 
     def __init__(self, total=None, entity='', laps=None, full_total=None):
+        # Name of entity, lap units (e.g. rps, wps), total items in job
         self._entity = entity
         self._lap_units = laps or []
         self._total = total
         self._full_total = full_total or total
         self._start_time = perf()
 
+        # Lap checkpoints (reused each batch), # processed, last # processed
+        self._laps = []
+        self._processed = 0
+        self._last_items = 0
+
     def batch_start(self):
         """Signal new batch; call at top of loop."""
-        self._laps = []
+        self._laps.clear()
         self.batch_lap()
 
     def batch_lap(self):
@@ -43,7 +43,10 @@ setup(
         'configargparse',
         'pdoc',
     ],
-    extras_require={'test': tests_require},
+    extras_require={
+        'test': tests_require,
+        'orjson': ['orjson'],
+    },
     entry_points={
         'console_scripts': [
             'hive=hive.cli:run',
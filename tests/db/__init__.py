@@ -0,0 +1 @@
+"""Hive db adapter tests."""
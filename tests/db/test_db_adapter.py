@@ -0,0 +1,20 @@
+#pylint: disable=missing-docstring
+import sqlalchemy
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from hive.db.adapter import _positional_sql
+
+def _compile(sql):
+    return _positional_sql(sqlalchemy.text(sql), psycopg2.dialect())
+
+def test_positional_sql():
+    assert _compile("SELECT id FROM hive_posts") == ("SELECT id FROM hive_posts", [])
+    assert _compile("SELECT id FROM t WHERE a = :a AND b = :b OR c = :a") == (
+        "SELECT id FROM t WHERE a = $1 AND b = $2 OR c = $1", ['a', 'b'])
+
+def test_positional_sql_literals():
+    sql = ("SELECT id::int FROM t WHERE d > '2020-01-01 10:00:00'"
+           " AND n LIKE 'x%' AND a = :a")
+    assert _compile(sql) == (
+        "SELECT id::int FROM t WHERE d > '2020-01-01 10:00:00'"
+        " AND n LIKE 'x%' AND a = $1", ['a'])
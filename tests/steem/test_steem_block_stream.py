@@ -0,0 +1,70 @@
+#pylint: disable=missing-docstring
+#pylint: disable=redefined-outer-name
+import datetime
+import pytest
+
+from hive.utils.normalize import block_num
+from hive.steem.client import SteemClient
+import hive.steem.block.stream as stream
+
+GENESIS = datetime.datetime(2020, 1, 1)
+
+def _block(num):
+    date = GENESIS + datetime.timedelta(seconds=3 * num)
+    return {'block_id': '%08x' % num + 'f' * 32,
+            'previous': '%08x' % (num - 1) + 'f' * 32,
+            'timestamp': date.strftime('%Y-%m-%dT%H:%M:%S'),
+            'transactions': []}
+
+class StubNode:
+    """Fake node: blocks up to `last` exist, `head` is reported head.
+
+    A request whose first block is missing makes that block available
+    afterwards, so a stream which retries can proceed."""
+    def __init__(self, last, head):
+        self.last = last
+        self.head = head
+
+    def _get_blocks(self, nums):
+        results = [{'block': _block(num)} if num <= self.last else {}
+                   for num in nums]
+        if not results[0]:
+            self.last += 1
+        return results
+
+    def exec(self, method, params=None):
+        if method == 'get_block':
+            return self._get_blocks([params['block_num']])[0]
+        assert method == 'get_dynamic_global_properties'
+        return {'head_block_number': self.head, 'time': '2020-01-01T00:00:00'}
+
+    def exec_multi(self, method, params, max_workers=None, batch_size=None):
+        # pylint: disable=unused-argument
+        assert method == 'get_block'
+        yield self._get_blocks([param['block_num'] for param in params])
+
+@pytest.fixture
+def node():
+    return StubNode(last=20, head=30)
+
+@pytest.fixture
+def client(node):
+    client = SteemClient()
+    client._client['default'] = node # pylint: disable=protected-access
+    return client
+
+def test_get_blocks_range_strict(client):
+    assert [block_num(b) for b in client.get_blocks_range(15, 20)] == list(range(15, 20))
+    with pytest.raises(AssertionError):
+        client.get_blocks_range(18, 25)
+
+def test_get_blocks_range_not_strict(client):
+    blocks = client.get_blocks_range(18, 25, strict=False)
+    assert [block_num(b) for b in blocks] == [18, 19, 20]
+    assert client.get_blocks_range(22, 25, strict=False) == []
+
+def test_stream_past_missing_block(client, monkeypatch):
+    monkeypatch.setattr(stream, 'sleep', lambda secs: None)
+    blocks = client.stream_blocks(10, trail_blocks=0, max_gap=None)
+    nums = [block_num(next(blocks)) for _ in range(13)]
+    assert nums == list(range(10, 23))
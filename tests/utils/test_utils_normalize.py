@@ -16,6 +16,7 @@ from hive.utils.normalize import (
     parse_time,
     utc_timestamp,
     load_json_key,
+    json_loads,
     trunc,
     rep_log10,
     safe_img_url,
@@ -24,6 +25,12 @@ from hive.utils.normalize import (
     int_log_level,
 )
 
+def test_json_loads():
+    assert json_loads('{"a": [1, "x"]}') == {'a': [1, 'x']}
+    assert json_loads(b'{"a": null}') == {'a': None}
+    # unpaired surrogate escape: rejected by orjson, must still parse
+    assert json_loads(b'{"body": "x \\ud83d y"}') == {'body': 'x \ud83d y'}
+
 def test_secs_to_str():
     assert secs_to_str(0) == '00s'
     assert secs_to_str(8979) == '02h 29m 39s'
@@ -0,0 +1,27 @@
+#pylint: disable=missing-docstring
+from hive.utils.timer import adapt_batch_size
+
+BOUNDS = (250, 4000)
+
+def _adapt(size, count, secs):
+    return adapt_batch_size(size, count, secs, 10, BOUNDS)
+
+def test_adapt_batch_size():
+    assert _adapt(1000, 1000, 10) == 1000
+    assert _adapt(1000, 1000, 4) == 2000
+    assert _adapt(1000, 1000, 21) == 500
+
+def test_adapt_batch_size_clamp():
+    assert _adapt(3000, 3000, 1) == 4000
+    assert _adapt(4000, 4000, 1) == 4000
+    assert _adapt(300, 300, 30) == 250
+    assert _adapt(250, 250, 30) == 250
+
+def test_adapt_batch_size_per_item():
+    # batch fetched before size grew to 2000: 1000 items in 4s
+    # projects to 8s for a full batch, so size holds
+    assert _adapt(2000, 1000, 4) == 2000
+    # small final batch is judged per item too
+    assert _adapt(1000, 10, 0.1) == 1000
+    assert _adapt(1000, 10, 0.3) == 500
+    assert _adapt(1000, 0, 0) == 1000